@@ -0,0 +1,16 @@
+"""
+Gunicorn configuration for the EMR NER API.
+
+The GLiNER model lives in process memory, so the API runs as a single worker process
+with a pool of threads. The model is loaded once per host, one CUDA context is
+created, and requests from every thread feed the same dynamic batcher.
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
+worker_class = 'gthread'
+# One thread per in-flight request; matches the default GLINER_BATCH_MAX_SIZE so batches can fill.
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+# Loading (and optionally compiling) the model can take well over the 30s default.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 180))
@@ -0,0 +1,97 @@
+from concurrent.futures import Future
+from prometheus_client import Histogram
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger('nerinference')
+
+inference_batch_size = Histogram('inference_batch_size', 'Number of requests coalesced into a single forward pass',
+                                 buckets=(1, 2, 4, 8, 16, 32, 64))
+
+
+class DynamicBatcher:
+    """
+    Coalesce concurrent prediction requests into batched model calls.
+
+    Request threads call `submit` and block until their result is ready. A single
+    background worker drains the queue, collecting up to `max_batch_size` requests or
+    waiting at most `max_wait_ms` after the first one arrives, groups them by identical
+    label set and runs `batch_fn(texts, labels)` once per group.
+
+    The worker is started lazily on the first submission so that it always lives in the
+    process that serves requests (e.g. after a server has forked its workers).
+    """
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_ms=5):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="gliner-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, text, labels):
+        if self._worker is None or not self._worker.is_alive():
+            self.start()
+        future = Future()
+        self._queue.put((text, tuple(labels), future))
+        return future.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                groups = {}
+                for text, labels, future in batch:
+                    groups.setdefault(labels, []).append((text, future))
+
+                for labels, items in groups.items():
+                    self._run_group(list(labels), items)
+            except BaseException as e:
+                # Never leave a caller blocked on future.result() if the worker dies
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+
+    def _run_group(self, labels, items):
+        """
+        Run one label group through `batch_fn`.
+
+        If the batched call fails, each text is retried on its own so that only the
+        request that actually fails (e.g. an oversized text hitting an OOM) gets the error.
+        """
+        inference_batch_size.observe(len(items))
+        try:
+            results = self.batch_fn([text for text, _ in items], labels)
+        except Exception as e:
+            if len(items) == 1:
+                logger.error(f"Batched prediction failed: {str(e)}")
+                items[0][1].set_exception(e)
+                return
+            logger.warning(f"Batched prediction of {len(items)} texts failed ({str(e)}), retrying one at a time")
+            for item in items:
+                self._run_group(labels, [item])
+            return
+        for (_, future), entities in zip(items, results):
+            future.set_result(entities)
@@ -0,0 +1,153 @@
+from collections import OrderedDict
+from django.conf import settings
+from gliner import GLiNER
+from prometheus_client import Counter
+from .batching import DynamicBatcher
+import functools
+import logging
+import threading
+import time
+import torch
+
+logger = logging.getLogger('nerinference')
+
+prediction_cache_requests = Counter('prediction_cache_requests', 'Prediction cache lookups', ['result'])
+
+device = settings.GLINER_DEVICE or ("cuda" if torch.cuda.is_available() else "cpu")
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def load_model():
+    """
+    Load the GLiNER checkpoint configured by GLINER_MODEL_NAME.
+
+    CPU deployments can serve an int8-quantized ONNX export (see the export_onnx
+    management command) instead. With GLINER_COMPILE enabled the PyTorch model is
+    wrapped in torch.compile.
+    """
+    if settings.GLINER_ONNX_MODEL_FILE and device == "cpu":
+        model = GLiNER.from_pretrained(settings.GLINER_MODEL_NAME, load_onnx_model=True,
+                                       onnx_model_file=settings.GLINER_ONNX_MODEL_FILE)
+    else:
+        model = GLiNER.from_pretrained(settings.GLINER_MODEL_NAME, map_location=device)
+
+    if settings.GLINER_COMPILE and not model.onnx_model:
+        torch.set_float32_matmul_precision("high")
+        # Batches vary in size and padded length, so recording a CUDA graph per shape would
+        # grow the graph memory pool without bound; skip CUDA graphs for dynamic-shape graphs.
+        torch._inductor.config.triton.cudagraph_skip_dynamic_graphs = True
+        model.model = torch.compile(model.model, mode="reduce-overhead", dynamic=True)
+    return model
+
+
+def get_model():
+    """Return the shared GLiNER model, loading it on first use."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_model()
+                logger.info(f"Loaded GLiNER model {settings.GLINER_MODEL_NAME} on {device}")
+    return _model
+
+
+@functools.lru_cache(maxsize=settings.GLINER_LABEL_CACHE_SIZE)
+def encode_labels(labels):
+    """
+    Label embeddings for a bi-encoder model, cached per label tuple.
+
+    Encodes through the labels encoder directly rather than GLiNER.encode_labels, which
+    writes a tqdm progress bar to stderr on every call.
+    """
+    model = get_model()
+    tokenized_labels = model.data_processor.labels_tokenizer(list(labels), return_tensors="pt", truncation=True,
+                                                             padding="max_length").to(device)
+    return model.model.token_rep_layer.encode_labels(**tokenized_labels)
+
+
+def predict_batch(texts, labels):
+    """
+    Run a single forward pass over `texts` for one shared label set.
+
+    Bi-encoder checkpoints encode labels separately from the text, so their label
+    embeddings are computed once per label set and reused across requests. With
+    GLINER_BF16 enabled the forward pass (and any cached label embeddings) run in
+    bfloat16 under autocast.
+    """
+    model = get_model()
+    with torch.inference_mode(), torch.autocast(torch.device(device).type, dtype=torch.bfloat16,
+                                                enabled=settings.GLINER_BF16):
+        if model.config.labels_encoder is not None and not model.onnx_model:
+            labels = list(dict.fromkeys(labels))
+            return model.batch_predict_with_embeds(texts, encode_labels(tuple(labels)), labels)
+        return model.batch_predict_entities(texts, labels)
+
+
+batcher = DynamicBatcher(predict_batch,
+                         max_batch_size=settings.GLINER_BATCH_MAX_SIZE,
+                         max_wait_ms=settings.GLINER_BATCH_WAIT_MS)
+
+_prediction_cache = OrderedDict()
+_prediction_cache_lock = threading.Lock()
+
+
+def predict(text, labels):
+    """
+    Predict entities for a single text.
+
+    Results are kept in an LRU cache keyed by the exact `(text, labels)` pair so that
+    repeated documents skip the model entirely. Texts longer than
+    GLINER_PREDICTION_CACHE_MAX_TEXT_LENGTH are never cached.
+
+    Returns `(entities, cached)`, where `cached` is True when the result came from the
+    cache rather than a model call.
+    """
+    if not settings.GLINER_PREDICTION_CACHE_SIZE or len(text) > settings.GLINER_PREDICTION_CACHE_MAX_TEXT_LENGTH:
+        return batcher.submit(text, labels), False
+
+    key = (text, tuple(labels))
+    with _prediction_cache_lock:
+        entities = _prediction_cache.get(key)
+        if entities is not None:
+            _prediction_cache.move_to_end(key)
+    if entities is not None:
+        prediction_cache_requests.labels("hit").inc()
+        return [dict(entity) for entity in entities], True
+
+    prediction_cache_requests.labels("miss").inc()
+    entities = batcher.submit(text, labels)
+    with _prediction_cache_lock:
+        # Store copies so callers mutating the returned dicts can't corrupt the cache
+        _prediction_cache[key] = tuple(dict(entity) for entity in entities)
+        _prediction_cache.move_to_end(key)
+        while len(_prediction_cache) > settings.GLINER_PREDICTION_CACHE_SIZE:
+            _prediction_cache.popitem(last=False)
+    return entities, False
+
+
+def warmup():
+    """
+    Load the model and run synthetic predictions of increasing length through the batcher.
+
+    This moves the model download, weight loading and first-call kernel setup out of the
+    request path. With GLINER_COMPILE enabled it also traces and captures the compiled
+    graphs on the batcher thread, which is the thread that serves real requests.
+    """
+    start_time = time.time()
+    get_model()
+    for length in (32, 64, 128, 256, 512):
+        batcher.submit(" ".join(["x"] * length), ["person"])
+    logger.info(f"GLiNER warm-up finished in {time.time() - start_time:.2f} s")
+
+
+def start_warmup():
+    """Run `warmup` on a background daemon thread, logging (not raising) any failure."""
+    def _warmup():
+        try:
+            warmup()
+        except Exception as e:
+            logger.error(f"Model warm-up failed: {str(e)}")
+
+    threading.Thread(target=_warmup, name="gliner-warmup", daemon=True).start()
@@ -0,0 +1,67 @@
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from gliner import GLiNER
+from onnxruntime.quantization import QuantType, quantize_dynamic
+import torch
+
+
+def export_onnx(module, inputs, dynamic_axes, onnx_path):
+    """
+    Export `module` to ONNX, passing `inputs` to its forward as keyword arguments.
+
+    Uses the TorchScript exporter (dynamo=False): `input_names`/`dynamic_axes` are
+    its API, and the dynamo exporter, the default since torch 2.9, needs onnxscript.
+    """
+    torch.onnx.export(module, (inputs,), onnx_path,
+                      input_names=list(inputs), output_names=["logits"],
+                      dynamic_axes=dynamic_axes, opset_version=14, dynamo=False)
+
+
+def quantize_onnx(onnx_path, quantized_path):
+    """Quantize the weights of an ONNX model to int8 with ONNX Runtime dynamic quantization."""
+    quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QInt8)
+
+
+class Command(BaseCommand):
+    """
+    Export the configured GLiNER checkpoint to ONNX and quantize it to int8.
+
+    The output directory contains the GLiNER config and tokenizer together with
+    `model.onnx` and `model_quantized.onnx`, so it can be used directly as
+    GLINER_MODEL_NAME with GLINER_ONNX_MODEL_FILE=model_quantized.onnx.
+    """
+    help = "Export the GLiNER model to ONNX and quantize it to int8 for CPU inference."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output_dir", help="Directory to write the exported model to.")
+        parser.add_argument("--model", default=settings.GLINER_MODEL_NAME,
+                            help="GLiNER checkpoint to export (defaults to GLINER_MODEL_NAME).")
+
+    def handle(self, *args, **options):
+        output_dir = Path(options["output_dir"])
+        model = GLiNER.from_pretrained(options["model"], map_location="cpu")
+        model.save_pretrained(output_dir)
+
+        inputs, _ = model.prepare_model_inputs(["Mrs. Aruna Gupta, age 60, was given 325 mg of Aspirin."],
+                                               ["patient name", "age", "dosage"])
+        input_names = ["input_ids", "attention_mask", "words_mask", "text_lengths"]
+        dynamic_axes = {
+            "input_ids": {0: "batch_size", 1: "sequence_length"},
+            "attention_mask": {0: "batch_size", 1: "sequence_length"},
+            "words_mask": {0: "batch_size", 1: "sequence_length"},
+            "text_lengths": {0: "batch_size", 1: "value"},
+            "logits": {0: "position", 1: "batch_size", 2: "sequence_length", 3: "num_spans"},
+        }
+        if model.config.span_mode != "token_level":
+            input_names += ["span_idx", "span_mask"]
+            dynamic_axes["span_idx"] = {0: "batch_size", 1: "num_spans", 2: "idx"}
+            dynamic_axes["span_mask"] = {0: "batch_size", 1: "num_spans"}
+
+        onnx_path = output_dir / "model.onnx"
+        export_onnx(model.model, {name: inputs[name] for name in input_names}, dynamic_axes, onnx_path)
+        self.stdout.write(f"Exported {onnx_path}")
+
+        quantized_path = output_dir / "model_quantized.onnx"
+        quantize_onnx(onnx_path, quantized_path)
+        self.stdout.write(self.style.SUCCESS(f"Quantized model written to {quantized_path}"))
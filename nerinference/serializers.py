@@ -1,7 +1,8 @@
 from rest_framework import serializers
 
 class TextInputSerializer(serializers.Serializer):
-    text = serializers.CharField()
+    # Blank text is accepted; PredictView answers it without running the model
+    text = serializers.CharField(allow_blank=True)
     labels = serializers.ListField(
         child=serializers.CharField()
     )
@@ -1,3 +1,266 @@
-from django.test import TestCase
+from concurrent.futures import Future
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from . import inference
+from .batching import DynamicBatcher
+from .management.commands.export_onnx import export_onnx, quantize_onnx
+import onnxruntime
+import torch
 
-# Create your tests here.
+
+def _enqueue(batcher, text, labels):
+    # Queue a request without blocking so the worker sees every item at once
+    future = Future()
+    batcher._queue.put((text, tuple(labels), future))
+    return future
+
+
+class DynamicBatcherTests(TestCase):
+    """Tests for DynamicBatcher using a stub batch_fn instead of the GLiNER model."""
+
+    def setUp(self):
+        self.calls = []
+
+    def batch_fn(self, texts, labels):
+        self.calls.append((list(texts), list(labels)))
+        if "boom" in texts:
+            raise RuntimeError("bad text")
+        return [[{"text": text, "label": labels[0]}] for text in texts]
+
+    def test_groups_requests_by_label_set(self):
+        batcher = DynamicBatcher(self.batch_fn, max_batch_size=8, max_wait_ms=50)
+        futures = [
+            _enqueue(batcher, "a", ["person"]),
+            _enqueue(batcher, "b", ["age"]),
+            _enqueue(batcher, "c", ["person"]),
+        ]
+        batcher.start()
+
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(sorted(self.calls), [(["a", "c"], ["person"]), (["b"], ["age"])])
+        self.assertEqual(results, [[{"text": "a", "label": "person"}],
+                                   [{"text": "b", "label": "age"}],
+                                   [{"text": "c", "label": "person"}]])
+
+    def test_batch_size_metric_counts_each_forward_pass(self):
+        batcher = DynamicBatcher(self.batch_fn, max_batch_size=8, max_wait_ms=50)
+        futures = [_enqueue(batcher, text, labels)
+                   for text, labels in (("a", ["person"]), ("b", ["age"]), ("c", ["person"]))]
+
+        with mock.patch("nerinference.batching.inference_batch_size") as histogram:
+            batcher.start()
+            for future in futures:
+                future.result(timeout=5)
+
+        self.assertEqual(sorted(args[0] for args, _ in histogram.observe.call_args_list), [1, 2])
+
+    def test_caps_batch_size(self):
+        batcher = DynamicBatcher(self.batch_fn, max_batch_size=2, max_wait_ms=50)
+        futures = [_enqueue(batcher, str(i), ["person"]) for i in range(5)]
+        batcher.start()
+
+        for future in futures:
+            future.result(timeout=5)
+
+        self.assertEqual([len(texts) for texts, _ in self.calls], [2, 2, 1])
+
+    def test_failure_is_isolated_to_failing_request(self):
+        batcher = DynamicBatcher(self.batch_fn, max_batch_size=8, max_wait_ms=50)
+        futures = [_enqueue(batcher, text, ["person"]) for text in ("a", "boom", "b")]
+        batcher.start()
+
+        self.assertEqual(futures[0].result(timeout=5), [{"text": "a", "label": "person"}])
+        with self.assertRaises(RuntimeError):
+            futures[1].result(timeout=5)
+        self.assertEqual(futures[2].result(timeout=5), [{"text": "b", "label": "person"}])
+
+    def test_worker_death_resolves_pending_futures(self):
+        def batch_fn(texts, labels):
+            raise SystemExit
+
+        batcher = DynamicBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+        futures = [_enqueue(batcher, text, ["person"]) for text in ("a", "b")]
+        batcher.start()
+
+        for future in futures:
+            with self.assertRaises(SystemExit):
+                future.result(timeout=5)
+
+
+class LabelEmbeddingCacheTests(TestCase):
+    """Tests for predict_batch's bi-encoder label-embedding cache, with a mocked model."""
+
+    def setUp(self):
+        inference.encode_labels.cache_clear()
+        self.addCleanup(inference.encode_labels.cache_clear)
+        self.model = mock.MagicMock()
+        self.model.config.labels_encoder = "BAAI/bge-small-en-v1.5"
+        self.model.onnx_model = False
+        self.model.data_processor.labels_tokenizer.return_value.to.return_value = {"input_ids": "tokens"}
+        patcher = mock.patch.object(inference, "get_model", return_value=self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_labels_are_encoded_once(self):
+        inference.predict_batch(["a"], ["person", "age", "person"])
+        inference.predict_batch(["b"], ["person", "age"])
+
+        self.model.data_processor.labels_tokenizer.assert_called_once()
+        self.assertEqual(self.model.data_processor.labels_tokenizer.call_args.args[0], ["person", "age"])
+        self.model.model.token_rep_layer.encode_labels.assert_called_once_with(input_ids="tokens")
+        embeddings = self.model.model.token_rep_layer.encode_labels.return_value
+        self.model.batch_predict_with_embeds.assert_called_with(["b"], embeddings, ["person", "age"])
+        self.model.batch_predict_entities.assert_not_called()
+
+    def test_uni_encoder_and_onnx_models_skip_the_cache(self):
+        self.model.config.labels_encoder = None
+        inference.predict_batch(["a"], ["person"])
+
+        self.model.config.labels_encoder = "BAAI/bge-small-en-v1.5"
+        self.model.onnx_model = True
+        inference.predict_batch(["b"], ["person"])
+
+        self.assertEqual(self.model.batch_predict_entities.call_count, 2)
+        self.model.model.token_rep_layer.encode_labels.assert_not_called()
+        self.model.batch_predict_with_embeds.assert_not_called()
+
+
+@override_settings(GLINER_PREDICTION_CACHE_SIZE=2, GLINER_PREDICTION_CACHE_MAX_TEXT_LENGTH=20)
+class PredictionCacheTests(TestCase):
+    """Tests for the (text, labels) LRU cache in front of the batcher."""
+
+    def setUp(self):
+        inference._prediction_cache.clear()
+        patcher = mock.patch.object(inference, "batcher")
+        self.batcher = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.batcher.submit.side_effect = lambda text, labels: [{"text": text, "label": labels[0]}]
+
+    def test_hit_and_miss(self):
+        first, first_cached = inference.predict("Aruna Gupta", ["person"])
+        second, second_cached = inference.predict("Aruna Gupta", ["person"])
+        _, other_cached = inference.predict("Aruna Gupta", ["age"])
+
+        self.assertEqual(first, second)
+        self.assertEqual((first_cached, second_cached, other_cached), (False, True, False))
+        self.assertEqual(self.batcher.submit.call_count, 2)
+
+    def test_evicts_least_recently_used(self):
+        inference.predict("a", ["person"])
+        inference.predict("b", ["person"])
+        inference.predict("a", ["person"])  # hit, "b" is now least recently used
+        inference.predict("c", ["person"])  # evicts "b"
+        self.batcher.submit.reset_mock()
+
+        inference.predict("a", ["person"])
+        self.batcher.submit.assert_not_called()
+        inference.predict("b", ["person"])
+        self.batcher.submit.assert_called_once_with("b", ["person"])
+
+    def test_long_text_bypasses_cache(self):
+        text = "x" * 21
+        inference.predict(text, ["person"])
+        _, cached = inference.predict(text, ["person"])
+
+        self.assertFalse(cached)
+        self.assertEqual(self.batcher.submit.call_count, 2)
+        self.assertEqual(len(inference._prediction_cache), 0)
+
+    def test_returned_entities_do_not_alias_cache(self):
+        inference.predict("a", ["person"])[0][0]["label"] = "changed"
+        inference.predict("a", ["person"])[0][0]["label"] = "changed"
+
+        self.assertEqual(inference.predict("a", ["person"]), ([{"text": "a", "label": "person"}], True))
+
+
+class PredictViewTests(TestCase):
+    """Tests for the input handling in PredictView, with inference mocked out."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="tester", password="secret"))
+        patcher = mock.patch("nerinference.views.predict",
+                             return_value=([{"text": "Aruna Gupta", "label": "patient name", "start": 5, "end": 16}],
+                                           False))
+        self.predict = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, data):
+        return self.client.post(reverse("predict"), data, format="json")
+
+    def test_empty_labels_skip_the_model(self):
+        response = self.post({"text": "Mrs. Aruna Gupta, age 60", "labels": []})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"entities": []})
+        self.predict.assert_not_called()
+
+    def test_blank_text_skips_the_model(self):
+        response = self.post({"text": "   ", "labels": ["patient name"]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"entities": []})
+        self.predict.assert_not_called()
+
+    def test_labels_are_deduplicated_in_order(self):
+        response = self.post({"text": "Mrs. Aruna Gupta, age 60",
+                              "labels": ["patient name", "age", "patient name"]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"entities": [{"text": "Aruna Gupta", "label": "patient name"}]})
+        self.predict.assert_called_once_with("Mrs. Aruna Gupta, age 60", ["patient name", "age"])
+
+    def test_cache_hits_are_not_recorded_as_inference_latency(self):
+        observe = "nerinference.views.inference_latency.observe"
+        with mock.patch(observe) as observed:
+            self.post({"text": "Mrs. Aruna Gupta", "labels": ["patient name"]})
+        observed.assert_called_once()
+
+        self.predict.return_value = ([], True)
+        with mock.patch(observe) as observed:
+            response = self.post({"text": "Mrs. Aruna Gupta", "labels": ["patient name"]})
+        self.assertEqual(response.status_code, 200)
+        observed.assert_not_called()
+
+    def test_invalid_input_returns_400(self):
+        response = self.post({"text": "Mrs. Aruna Gupta, age 60"})
+
+        self.assertEqual(response.status_code, 400)
+        self.predict.assert_not_called()
+
+
+class _KeywordModule(torch.nn.Module):
+    # Like GLiNER's model, forward takes its tensors as keyword arguments
+    def __init__(self):
+        super().__init__()
+        self.linear = torch.nn.Linear(4, 2)
+
+    def forward(self, input_ids=None, attention_mask=None):
+        return self.linear(input_ids * attention_mask)
+
+
+class ExportOnnxTests(TestCase):
+    """Smoke test for the export and quantization steps of the export_onnx command."""
+
+    def test_export_and_quantize_tiny_module(self):
+        inputs = {"input_ids": torch.rand(2, 3, 4), "attention_mask": torch.ones(2, 3, 4)}
+        dynamic_axes = {"input_ids": {0: "batch_size", 1: "sequence_length"},
+                        "attention_mask": {0: "batch_size", 1: "sequence_length"}}
+
+        with TemporaryDirectory() as tmp:
+            onnx_path = Path(tmp) / "model.onnx"
+            quantized_path = Path(tmp) / "model_quantized.onnx"
+            export_onnx(_KeywordModule().eval(), inputs, dynamic_axes, onnx_path)
+            quantize_onnx(onnx_path, quantized_path)
+
+            session = onnxruntime.InferenceSession(str(quantized_path), providers=["CPUExecutionProvider"])
+            (logits,) = session.run(None, {"input_ids": torch.rand(1, 5, 4).numpy(),
+                                           "attention_mask": torch.ones(1, 5, 4).numpy()})
+
+        self.assertEqual(logits.shape, (1, 5, 2))
@@ -3,8 +3,8 @@ from django.http import HttpResponse
 from rest_framework.views import APIView ,View
 from rest_framework.response import Response
 from rest_framework import status
-from gliner import GLiNER
 from .serializers import TextInputSerializer
+from .inference import predict
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import AllowAny
 from django.contrib.auth.models import User
@@ -12,6 +12,7 @@ from django.contrib.auth import authenticate
 from prometheus_client import Histogram, Counter, Gauge, Summary
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import AllowAny
+from collections import Counter as PyCounter
 import logging
 import time
 
@@ -21,9 +22,6 @@ inference_latency = Histogram('inference_latency_milliseconds', 'Time taken for
 inference_throughput = Counter('inference_throughput', 'Total number of inferences processed')
 entity_frequency = Counter('entity_frequency', 'Frequency of detected entities', ['entity_type'])
 
-# Load the GLiNER model once during initialization
-model = GLiNER.from_pretrained("urchade/gliner_medium-v2.1")
-
 # Registration endpoint
 
 @permission_classes([AllowAny]) 
@@ -114,7 +112,8 @@ class PredictView(APIView):
     - text: The input text for prediction.
     - labels: A list of labels for which the prediction will be made.
 
-    The view validates the input using the TextInputSerializer. If the input is valid, it runs the inference 
+    The view validates the input using the TextInputSerializer. Requests with no labels or blank text return
+    an empty entity list without running the model. Otherwise it runs the inference 
     and captures the latency of the prediction. It returns a list of entities detected in the input text 
     along with their labels. If the input is invalid, it returns a 400 Bad Request response with 
     the validation errors. Any unexpected errors are logged, and a 500 Internal Server Error response is returned.
@@ -128,20 +127,29 @@ class PredictView(APIView):
             if serializer.is_valid():
                 try:
                     text = serializer.validated_data["text"]
-                    labels = serializer.validated_data["labels"]
+                    # Drop repeated labels, keeping the order they were given in
+                    labels = list(dict.fromkeys(serializer.validated_data["labels"]))
+
+                    # Nothing to find, skip the model entirely
+                    if not labels or not text.strip():
+                        return Response({"entities": []}, status=status.HTTP_200_OK)
 
                     # Run inference and capture latency
                     start_time = time.time()
                       # Automatically tracks latency
-                    entities = model.predict_entities(text, labels)
+                    entities, cached = predict(text, labels)
                     end_time = time.time()
                     inference_time = (end_time - start_time) * 1000  # in milliseconds
-                    inference_latency.observe(inference_time) 
-                    logger.info(f"Prediction successful with entities and inference time {inference_time:.2f} ms")
-                    # Update entity frequency
-                    for entity in entities:
-                        entity_type = entity["label"]
-                        entity_frequency.labels(entity_type).inc()  # Increment count for each entity type
+                    if cached:
+                        # Cache hits don't run the model; they are counted by prediction_cache_requests
+                        logger.info(f"Prediction served from cache in {inference_time:.2f} ms")
+                    else:
+                        inference_latency.observe(inference_time)
+                        logger.info(f"Prediction successful with entities and inference time {inference_time:.2f} ms")
+                    # Update entity frequency once per entity type rather than once per entity
+                    entity_counts = PyCounter(entity["label"] for entity in entities)
+                    for entity_type, count in entity_counts.items():
+                        entity_frequency.labels(entity_type).inc(count)
                     response_data = [{"text": entity["text"],
                                     "label": entity["label"]} for entity in entities]
 
@@ -152,7 +160,7 @@ class PredictView(APIView):
                                     status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             else:
                 logger.warning(f"Invalid input: {serializer.errors}")
-                return Response(serializer.errors, status=status.HTTP_500_BAD_REQUEST)
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 @permission_classes([AllowAny])           
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -59,6 +60,8 @@ REST_FRAMEWORK = {
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Compress responses (large entity lists) for clients that send Accept-Encoding: gzip
+    'django.middleware.gzip.GZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -144,6 +147,42 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# GLiNER inference
+
+GLINER_MODEL_NAME = os.environ.get('GLINER_MODEL_NAME', 'urchade/gliner_medium-v2.1')
+
+# Device to run the model on; defaults to CUDA when available, otherwise CPU.
+GLINER_DEVICE = os.environ.get('GLINER_DEVICE')
+
+# ONNX file inside the GLINER_MODEL_NAME directory (e.g. 'model_quantized.onnx', as
+# written by `manage.py export_onnx`) to serve through ONNX Runtime when running on CPU.
+GLINER_ONNX_MODEL_FILE = os.environ.get('GLINER_ONNX_MODEL_FILE')
+
+# Compile the model with torch.compile. Compiling during warm-up adds about a minute
+# to startup, so it is meant for production containers only. CUDA graphs are skipped
+# for dynamic-shape graphs so varying batch shapes don't grow GPU memory.
+GLINER_COMPILE = os.environ.get('GLINER_COMPILE') == '1'
+
+# Run inference in bfloat16 autocast. Needs an Ampere+ GPU or a CPU with AVX512-BF16;
+# check prediction parity against float32 before enabling it.
+GLINER_BF16 = os.environ.get('GLINER_BF16') == '1'
+
+# Concurrent /api/predict/ requests are coalesced into one forward pass of at most
+# GLINER_BATCH_MAX_SIZE texts, waiting up to GLINER_BATCH_WAIT_MS for a batch to fill.
+# A batch can't be larger than the number of in-flight requests, so keep this no higher
+# than GUNICORN_THREADS.
+GLINER_BATCH_MAX_SIZE = int(os.environ.get('GLINER_BATCH_MAX_SIZE', 32))
+GLINER_BATCH_WAIT_MS = float(os.environ.get('GLINER_BATCH_WAIT_MS', 5))
+
+# Number of label sets whose embeddings are kept when serving a bi-encoder checkpoint.
+GLINER_LABEL_CACHE_SIZE = int(os.environ.get('GLINER_LABEL_CACHE_SIZE', 256))
+
+# Predictions for repeated (text, labels) pairs are served from an LRU cache of this
+# many entries (0 disables it). Texts longer than the max length are not cached.
+GLINER_PREDICTION_CACHE_SIZE = int(os.environ.get('GLINER_PREDICTION_CACHE_SIZE', 4096))
+GLINER_PREDICTION_CACHE_MAX_TEXT_LENGTH = int(os.environ.get('GLINER_PREDICTION_CACHE_MAX_TEXT_LENGTH', 8192))
+
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'nermlops.settings')
 
 application = get_wsgi_application()
+
+# Only processes that serve requests import this module (gunicorn workers, runserver's
+# serving child), so this is where the model is loaded and warmed up in the background.
+from nerinference.inference import start_warmup  # noqa: E402
+
+start_warmup()